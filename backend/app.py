@@ -1,16 +1,49 @@
 
+import os
+import sys
+from pathlib import Path
+from dotenv import load_dotenv
+
+# Charger les variables d'environnement avant les modules config/services,
+# qui lisent certaines variables à l'import
+load_dotenv()
+
+# Ajouter le dossier backend au PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
 from flask import Flask, jsonify
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
-from config.database import init_db
+from config.database import init_db, flush_irrigation_logs
+from config.logging_config import setup_logging
 from routes.irrigation import irrigation_bp
 from routes.weather import weather_bp
 from routes.mqtt import mqtt_bp
 from routes.logs import logs_bp
 from routes.actors import actors_bp
-import os
+from services.ml_service import ml_service
+from waitress import serve
+import atexit
+import orjson
+
+# Exemple de features agro-climatiques (LOCAL_SETUP.md) pour le préchauffage
+ML_WARMUP_FEATURES = [25.0, 0, 65, 12.0, 1, 10000, 26.0, 42, 1.2, 6.8, 45, 38, 152, 3, 2]
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Sérialisation JSON via orjson (jsonify, request.get_json)"""
+    # Dates laissées à DefaultJSONProvider.default pour garder le format HTTP de Flask
+    option = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_PASSTHROUGH_DATETIME
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=self.option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
 
 def create_app():
+    setup_logging()
     app = Flask(__name__)
+    app.json = OrjsonProvider(app)
     
     # CORS pour développement local uniquement
     CORS(app, resources={
@@ -27,6 +60,9 @@ def create_app():
     
     # Initialiser DB
     init_db()
+    # Enregistré après setup_logging: atexit (LIFO) écrit les logs d'irrigation
+    # en attente avant d'arrêter le QueueListener
+    atexit.register(flush_irrigation_logs)
     
     # Enregistrer routes
     app.register_blueprint(irrigation_bp, url_prefix='/api')
@@ -52,9 +88,47 @@ def create_app():
     
     return app
 
-if __name__ == '__main__':
+def main(host='localhost'):
+    """Démarre le backend: vérifications, préchauffage ML puis serveur waitress"""
     app = create_app()
-    print("🚀 Backend Flask LOCAL - http://localhost:5002")
-    print("✅ Configuré pour frontend sur localhost:8080")
-    print("✅ Nouvelles routes acteurs disponibles")
-    app.run(debug=True, host='localhost', port=5002)
+    
+    print("=" * 60)
+    print("🚀 Backend Flask PulsarInfinite")
+    print("=" * 60)
+    print("📡 MQTT Broker: http://217.182.210.54:8080")
+    print("🌤️ Service météo: OpenWeather API")
+    print("🤖 Modèle ML: XGBoost arrosage")
+    print("💾 Base de données: SQLite (dans ~/.pulsar_irrigation/)")
+    print("🌐 API disponible sur: http://localhost:5002/api")
+    print("=" * 60)
+    
+    # Vérifications au démarrage
+    if not os.getenv("OPENWEATHER_API_KEY"):
+        print("⚠️  OPENWEATHER_API_KEY non définie - météo en mode fallback")
+    
+    model_path = os.path.join(os.path.dirname(__file__), 'models', 'xgboost_arrosage_litres.pkl')
+    if not os.path.exists(model_path):
+        print(f"⚠️  Modèle ML non trouvé: {model_path}")
+        print("📍 Placez xgboost_arrosage_litres.pkl dans backend/models/")
+    
+    # Afficher l'emplacement de la base de données
+    home_dir = Path.home()
+    db_path = home_dir / '.pulsar_irrigation' / 'irrigation_logs.db'
+    print(f"📂 Base de données: {db_path}")
+    
+    # Préchauffage du modèle ML: la première vraie requête /api/arroser ne paie
+    # pas le coût d'initialisation (booster XGBoost, DataFrame, caches)
+    try:
+        ml_service.predict_irrigation(ML_WARMUP_FEATURES)
+        print("✅ Préchauffage ML terminé")
+    except Exception as e:
+        print(f"⚠️  Préchauffage ML échoué: {e}")
+    
+    print("=" * 60)
+    
+    # Serveur WSGI multi-thread (un seul processus: l'état d'irrigation et le
+    # client MQTT sont partagés en mémoire entre toutes les requêtes)
+    serve(app, host=host, port=5002, threads=int(os.getenv("WAITRESS_THREADS", "8")))
+
+if __name__ == '__main__':
+    main()
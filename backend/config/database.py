@@ -1,7 +1,10 @@
 
 import sqlite3
 from datetime import datetime
+import logging
 import os
+import queue
+import threading
 import stat
 import tempfile
 from pathlib import Path
@@ -11,14 +14,25 @@ HOME_DIR = Path.home()
 DB_DIR = HOME_DIR / '.pulsar_irrigation'
 DATABASE_PATH = DB_DIR / 'irrigation_logs.db'
 
+logger = logging.getLogger(__name__)
+
+# File des logs d'irrigation: écrits par lots hors du chemin des requêtes
+IRRIGATION_LOG_BATCH_SIZE = 50
+_irrigation_log_queue = queue.SimpleQueue()
+_irrigation_log_lock = threading.Lock()
+_irrigation_log_thread = None
+# Marqueur d'arrêt déposé dans la file par flush_irrigation_logs
+_IRRIGATION_LOG_STOP = object()
+IRRIGATION_LOG_FLUSH_TIMEOUT = 5.0
+
 def ensure_db_directory():
     """Créer le répertoire de base de données s'il n'existe pas"""
     try:
         DB_DIR.mkdir(exist_ok=True)
-        print(f"✅ Répertoire DB créé/vérifié: {DB_DIR}")
+        logger.debug("✅ Répertoire DB créé/vérifié: %s", DB_DIR)
         return True
     except Exception as e:
-        print(f"❌ Erreur création répertoire: {e}")
+        logger.error("❌ Erreur création répertoire: %s", e)
         return False
 
 def get_db_connection():
@@ -40,27 +54,27 @@ def ensure_db_permissions():
         # Créer le fichier s'il n'existe pas
         if not DATABASE_PATH.exists():
             DATABASE_PATH.touch()
-            print(f"✅ Base de données créée: {DATABASE_PATH}")
+            logger.info("✅ Base de données créée: %s", DATABASE_PATH)
         
         # Définir les permissions de lecture/écriture
         DATABASE_PATH.chmod(0o666)
-        print(f"✅ Permissions définies pour: {DATABASE_PATH}")
+        logger.debug("✅ Permissions définies pour: %s", DATABASE_PATH)
         return True
         
     except Exception as e:
-        print(f"❌ Erreur permissions base de données: {e}")
+        logger.error("❌ Erreur permissions base de données: %s", e)
         return False
 
 def init_db():
     # Assurer les permissions avant d'initialiser
     if not ensure_db_permissions():
-        print("⚠️ Tentative de création dans un répertoire temporaire...")
+        logger.warning("⚠️ Tentative de création dans un répertoire temporaire...")
         # Fallback vers un répertoire temporaire
         global DATABASE_PATH
         temp_dir = Path(tempfile.gettempdir()) / 'pulsar_irrigation'
         temp_dir.mkdir(exist_ok=True)
         DATABASE_PATH = temp_dir / 'irrigation_logs.db'
-        print(f"📂 Utilisation du répertoire temporaire: {DATABASE_PATH}")
+        logger.warning("📂 Utilisation du répertoire temporaire: %s", DATABASE_PATH)
     
     try:
         conn = get_db_connection()
@@ -126,23 +140,93 @@ def init_db():
         
         conn.commit()
         conn.close()
-        print(f"✅ Base de données SQLite initialisée: {DATABASE_PATH}")
+        logger.info("✅ Base de données SQLite initialisée: %s", DATABASE_PATH)
         
     except Exception as e:
-        print(f"❌ Erreur initialisation DB: {e}")
+        logger.error("❌ Erreur initialisation DB: %s", e)
         raise
 
 def log_irrigation(action, duration_minutes=None, volume_m3=None, mqtt_status=None, source='manual', details=None):
+    """Enfile le log d'irrigation; l'écriture SQLite est faite par un thread dédié"""
+    _start_irrigation_log_worker()
+    _irrigation_log_queue.put_nowait((action, duration_minutes, volume_m3, mqtt_status, source, details))
+
+IRRIGATION_LOG_INSERT = '''
+    INSERT INTO irrigation_logs (action, duration_minutes, volume_m3, mqtt_status, source, details)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+
+def _write_irrigation_logs(rows):
+    """Écrit un lot en une transaction; en cas d'échec, réessaie ligne par ligne
+    pour ne perdre que les logs réellement invalides"""
     try:
         conn = get_db_connection()
-        conn.execute('''
-            INSERT INTO irrigation_logs (action, duration_minutes, volume_m3, mqtt_status, source, details)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (action, duration_minutes, volume_m3, mqtt_status, source, details))
-        conn.commit()
-        conn.close()
+        try:
+            conn.executemany(IRRIGATION_LOG_INSERT, rows)
+            conn.commit()
+            return
+        finally:
+            conn.close()
     except Exception as e:
-        print(f"❌ Erreur log irrigation: {e}")
+        logger.warning("⚠️ Échec écriture lot de %s logs irrigation, reprise ligne par ligne: %s", len(rows), e)
+
+    for row in rows:
+        try:
+            conn = get_db_connection()
+            try:
+                conn.execute(IRRIGATION_LOG_INSERT, row)
+                conn.commit()
+            finally:
+                conn.close()
+        except Exception as e:
+            logger.error("❌ Erreur log irrigation %s: %s", row, e)
+
+def _drain_irrigation_log_queue(first_row=None):
+    """Récupère jusqu'à IRRIGATION_LOG_BATCH_SIZE logs en attente;
+    retourne (logs, arrêt demandé)"""
+    if first_row is _IRRIGATION_LOG_STOP:
+        return [], True
+    rows = [first_row] if first_row is not None else []
+    while len(rows) < IRRIGATION_LOG_BATCH_SIZE:
+        try:
+            row = _irrigation_log_queue.get_nowait()
+        except queue.Empty:
+            break
+        if row is _IRRIGATION_LOG_STOP:
+            return rows, True
+        rows.append(row)
+    return rows, False
+
+def _irrigation_log_worker():
+    stopping = False
+    while not stopping:
+        # Bloque jusqu'au prochain log, puis écrit tout ce qui s'est accumulé en une transaction
+        rows, stopping = _drain_irrigation_log_queue(_irrigation_log_queue.get())
+        if rows:
+            _write_irrigation_logs(rows)
+
+def _start_irrigation_log_worker():
+    global _irrigation_log_thread
+    if _irrigation_log_thread is not None:
+        return
+    with _irrigation_log_lock:
+        if _irrigation_log_thread is None:
+            _irrigation_log_thread = threading.Thread(target=_irrigation_log_worker, daemon=True)
+            _irrigation_log_thread.start()
+
+def flush_irrigation_logs():
+    """Arrête le thread d'écriture après les logs encore en file (appelé à l'arrêt,
+    avant l'arrêt du QueueListener pour garder ses messages)"""
+    global _irrigation_log_thread
+    with _irrigation_log_lock:
+        thread, _irrigation_log_thread = _irrigation_log_thread, None
+        if thread is None:
+            return
+        # Le marqueur passe après les logs déjà en file: le thread les écrit puis s'arrête
+        _irrigation_log_queue.put_nowait(_IRRIGATION_LOG_STOP)
+        thread.join(IRRIGATION_LOG_FLUSH_TIMEOUT)
+    if thread.is_alive():
+        logger.warning("⚠️ Écriture des logs irrigation non terminée après %ss", IRRIGATION_LOG_FLUSH_TIMEOUT)
 
 def log_weather(location, temperature, humidity, wind_speed, precipitation):
     try:
@@ -154,7 +238,7 @@ def log_weather(location, temperature, humidity, wind_speed, precipitation):
         conn.commit()
         conn.close()
     except Exception as e:
-        print(f"❌ Erreur log météo: {e}")
+        logger.error("❌ Erreur log météo: %s", e)
 
 def log_mqtt(topic, message, status_code):
     try:
@@ -166,4 +250,4 @@ def log_mqtt(topic, message, status_code):
         conn.commit()
         conn.close()
     except Exception as e:
-        print(f"❌ Erreur log MQTT: {e}")
+        logger.error("❌ Erreur log MQTT: %s", e)
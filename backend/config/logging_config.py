@@ -0,0 +1,37 @@
+
+import atexit
+import logging
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+KNOWN_LOG_LEVELS = ("CRITICAL", "ERROR", "WARNING", "INFO", "DEBUG")
+
+_listener = None
+
+def setup_logging():
+    """Configure le logger racine: les requêtes déposent les messages dans une file,
+    un thread QueueListener se charge de l'écriture sur la console"""
+    global _listener
+    if _listener is not None:
+        return
+
+    # Niveau global des logs (DEBUG pour voir le détail des requêtes ML/irrigation),
+    # lu ici pour tenir compte du .env chargé avant create_app
+    log_level = os.getenv("LOG_LEVEL", "INFO").upper()
+
+    log_queue = queue.SimpleQueue()
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s [%(name)s] %(message)s"))
+
+    root = logging.getLogger()
+    root.setLevel(log_level if log_level in KNOWN_LOG_LEVELS else logging.INFO)
+    root.addHandler(QueueHandler(log_queue))
+
+    _listener = QueueListener(log_queue, console_handler, respect_handler_level=True)
+    _listener.start()
+    # Vider la file avant l'arrêt du processus
+    atexit.register(_listener.stop)
+
+    if log_level not in KNOWN_LOG_LEVELS:
+        logging.getLogger(__name__).warning("⚠️ LOG_LEVEL inconnu '%s', utilisation de INFO", log_level)
@@ -6,6 +6,7 @@ import sqlite3
 import os
 
 actors_bp = Blueprint('actors', __name__)
+logger = logging.getLogger(__name__)
 
 @actors_bp.route('/actors/register', methods=['POST'])
 def register_actor():
@@ -72,7 +73,7 @@ def register_actor():
         conn.commit()
         conn.close()
         
-        print(f"✅ Nouvel acteur enregistré: {data['prenom']} {data['nom']} (ID: {actor_id})")
+        logger.info("✅ Nouvel acteur enregistré: %s %s (ID: %s)", data['prenom'], data['nom'], actor_id)
         
         return jsonify({
             "success": True,
@@ -83,7 +84,7 @@ def register_actor():
         
     except sqlite3.OperationalError as e:
         error_msg = str(e)
-        print(f"❌ Erreur SQLite: {error_msg}")
+        logger.error("❌ Erreur SQLite: %s", error_msg)
         
         if "readonly database" in error_msg:
             return jsonify({
@@ -105,7 +106,7 @@ def register_actor():
             
     except Exception as e:
         error_msg = str(e)
-        print(f"❌ Erreur enregistrement acteur: {error_msg}")
+        logger.error("❌ Erreur enregistrement acteur: %s", error_msg)
         return jsonify({
             "error": "Erreur interne du serveur",
             "details": error_msg,
@@ -153,7 +154,7 @@ def update_actor(actor_id):
         conn.commit()
         conn.close()
         
-        logging.info(f"✅ Acteur modifié: {data['prenom']} {data['nom']} (ID: {actor_id})")
+        logger.info("✅ Acteur modifié: %s %s (ID: %s)", data['prenom'], data['nom'], actor_id)
         
         return jsonify({
             "success": True,
@@ -162,7 +163,7 @@ def update_actor(actor_id):
         }), 200
         
     except Exception as e:
-        logging.error(f"❌ Erreur modification acteur: {e}")
+        logger.error("❌ Erreur modification acteur: %s", e)
         return jsonify({"error": "Erreur interne du serveur"}), 500
 
 @actors_bp.route('/actors/<int:actor_id>', methods=['DELETE'])
@@ -183,7 +184,7 @@ def delete_actor(actor_id):
         conn.commit()
         conn.close()
         
-        logging.info(f"✅ Acteur supprimé: {actor[0]} {actor[1]} (ID: {actor_id})")
+        logger.info("✅ Acteur supprimé: %s %s (ID: %s)", actor[0], actor[1], actor_id)
         
         return jsonify({
             "success": True,
@@ -191,7 +192,7 @@ def delete_actor(actor_id):
         }), 200
         
     except Exception as e:
-        logging.error(f"❌ Erreur suppression acteur: {e}")
+        logger.error("❌ Erreur suppression acteur: %s", e)
         return jsonify({"error": "Erreur interne du serveur"}), 500
 
 @actors_bp.route('/actors/list', methods=['GET'])
@@ -247,7 +248,7 @@ def list_actors():
         
         conn.close()
         
-        logging.info(f"📋 Liste acteurs récupérée: {len(actors)} acteur(s)")
+        logger.debug("📋 Liste acteurs récupérée: %s acteur(s)", len(actors))
         
         return jsonify({
             "success": True,
@@ -256,7 +257,7 @@ def list_actors():
         }), 200
         
     except Exception as e:
-        logging.error(f"❌ Erreur récupération acteurs: {e}")
+        logger.error("❌ Erreur récupération acteurs: %s", e)
         return jsonify({"error": "Erreur interne du serveur"}), 500
 
 @actors_bp.route('/actors/<int:actor_id>', methods=['GET'])
@@ -301,7 +302,7 @@ def get_actor(actor_id):
                 "lng": row[12]
             }
         
-        logging.info(f"👤 Acteur récupéré: {actor['prenom']} {actor['nom']}")
+        logger.debug("👤 Acteur récupéré: %s %s", actor['prenom'], actor['nom'])
         
         return jsonify({
             "success": True,
@@ -309,5 +310,5 @@ def get_actor(actor_id):
         }), 200
         
     except Exception as e:
-        logging.error(f"❌ Erreur récupération acteur {actor_id}: {e}")
+        logger.error("❌ Erreur récupération acteur %s: %s", actor_id, e)
         return jsonify({"error": "Erreur interne du serveur"}), 500
@@ -1,16 +1,20 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response
+from werkzeug.exceptions import HTTPException
 from services.mqtt_service import mqtt_service
 from services.ml_service import ml_service
 from config.database import log_irrigation, get_db_connection
 import threading
 import time
+import logging
+import orjson
 import sqlite3
 from datetime import datetime, timedelta
 
 irrigation_bp = Blueprint("irrigation", __name__)
+logger = logging.getLogger(__name__)
 
-# État global de l'irrigation avec nettoyage automatique
-irrigation_state = {
+# État "aucune irrigation", réutilisé pour chaque reset/arrêt
+IDLE_IRRIGATION_STATE = {
     "isActive": False,
     "type": None,  # 'manual' ou 'ml'
     "startTime": None,
@@ -19,161 +23,235 @@ irrigation_state = {
     "threadId": None
 }
 
+# État global de l'irrigation avec nettoyage automatique
+irrigation_state = dict(IDLE_IRRIGATION_STATE)
+# Protège uniquement la vérification/réservation et la validation de l'état;
+# prédiction ML et commandes MQTT bloquantes s'exécutent hors verrou
+irrigation_lock = threading.Lock()
+# Arrêts MQTT en cours: aucun nouveau démarrage n'est réservé tant qu'ils ne sont pas terminés
+stops_in_progress = 0
+
+# Corps JSON des réponses constantes, sérialisés une seule fois au chargement
+STOP_BODY = orjson.dumps({
+    "success": True,
+    "message": "Irrigation arrêtée",
+    "mqtt_stopped": True
+})
+
+TRENDS_BODY = orjson.dumps({
+    "waterConsumption": 0.85,
+    "soilMoisture": 42,
+    "efficiency": 88,
+    "trend": "stable"
+})
+
+ML_PREDICTIONS_BODY = orjson.dumps({
+    "nextIrrigationHours": 6,
+    "recommendedDuration": 30,
+    "soilCondition": "Optimal",
+    "weatherImpact": "Favorable"
+})
+
+@irrigation_bp.errorhandler(Exception)
+def handle_irrigation_error(e):
+    """Réponse d'erreur commune aux endpoints du blueprint sans try/except propre"""
+    if isinstance(e, HTTPException):
+        return e
+    logger.exception("❌ Erreur irrigation: %s", e)
+    return jsonify({
+        "success": False,
+        "status": "error",
+        "message": f"Erreur serveur: {str(e)}"
+    }), 500
+
+def _owns_irrigation_state():
+    """Indique si l'état actif appartient au thread courant (à appeler sous irrigation_lock)"""
+    return irrigation_state["isActive"] and irrigation_state["threadId"] == threading.current_thread().ident
+
+def _release_irrigation_state():
+    """Remet l'état au repos s'il appartient encore au thread courant"""
+    with irrigation_lock:
+        if _owns_irrigation_state():
+            irrigation_state.update(IDLE_IRRIGATION_STATE)
+
+def _begin_stop():
+    """Remet l'état au repos et annule une réservation en cours (à appeler sous irrigation_lock)"""
+    global stops_in_progress
+    stops_in_progress += 1
+    irrigation_state.update(IDLE_IRRIGATION_STATE)
+
+def _end_stop():
+    global stops_in_progress
+    with irrigation_lock:
+        stops_in_progress -= 1
+
+def stop_irrigation_mqtt():
+    """Arrête l'irrigation via MQTT hors verrou, sans qu'un démarrage concurrent ne s'intercale"""
+    with irrigation_lock:
+        _begin_stop()
+    try:
+        return mqtt_service.arreter_arrosage()
+    finally:
+        _end_stop()
+
 def cleanup_stale_irrigation():
     """Nettoie automatiquement les irrigations bloquées"""
-    global irrigation_state
-    if irrigation_state["isActive"] and irrigation_state["startTime"]:
+    with irrigation_lock:
+        if not (irrigation_state["isActive"] and irrigation_state["startTime"]):
+            return False
         elapsed = time.time() - irrigation_state["startTime"]
         max_duration = (irrigation_state["duration"] or 30) * 60 + 300  # +5min buffer
-        if elapsed > max_duration:
-            print(f"🧹 Nettoyage automatique irrigation bloquée ({elapsed/60:.1f}min)")
-            mqtt_service.arreter_arrosage()
+        if elapsed <= max_duration:
+            return False
+        _begin_stop()
+
+    logger.warning("🧹 Nettoyage automatique irrigation bloquée (%.1fmin)", elapsed / 60)
+    try:
+        mqtt_service.arreter_arrosage()
+    finally:
+        _end_stop()
+    return True
+
+def reserve_irrigation(kind):
+    """Vérifie qu'aucune irrigation n'est active et réserve l'état pour le thread courant"""
+    cleanup_stale_irrigation()
+    with irrigation_lock:
+        if irrigation_state["isActive"] or stops_in_progress:
+            logger.warning("⚠️ Tentative démarrage %s mais irrigation active: %s", kind, irrigation_state)
+            return False
+        irrigation_state.update({
+            "isActive": True,
+            "type": kind,
+            "startTime": time.time(),
+            "duration": None,
+            "source": kind,
+            "threadId": threading.current_thread().ident
+        })
+        return True
+
+def commit_irrigation(kind, duration_minutes, volume_m3):
+    """Démarre l'irrigation réservée via MQTT, ou annule la réservation en cas d'échec"""
+    with irrigation_lock:
+        if not _owns_irrigation_state():
+            # Arrêt ou reset reçu pendant la préparation du démarrage
+            return False, "Irrigation arrêtée avant son démarrage"
+
+        try:
+            success, message = mqtt_service.demarrer_arrosage_async(
+                duration_minutes * 60,  # Convertir en secondes
+                volume_m3=volume_m3,
+                source=kind
+            )
+        except Exception:
+            irrigation_state.update(IDLE_IRRIGATION_STATE)
+            raise
+        if success:
             irrigation_state.update({
-                "isActive": False,
-                "type": None,
-                "startTime": None,
-                "duration": None,
-                "source": None,
-                "threadId": None
+                "startTime": time.time(),
+                "duration": duration_minutes
             })
-            return True
-    return False
+        else:
+            irrigation_state.update(IDLE_IRRIGATION_STATE)
+        return success, message
 
 @irrigation_bp.route("/irrigation/status", methods=["GET"])
 def get_irrigation_status():
     """Retourne l'état actuel de l'irrigation avec nettoyage automatique"""
     try:
         cleanup_stale_irrigation()
+        with irrigation_lock:
+            state = dict(irrigation_state)
         return jsonify({
             "status": "ok",
-            "isActive": irrigation_state["isActive"],
-            "type": irrigation_state["type"],
-            "startTime": irrigation_state["startTime"],
-            "duration": irrigation_state["duration"],
-            "source": irrigation_state["source"]
+            "isActive": state["isActive"],
+            "type": state["type"],
+            "startTime": state["startTime"],
+            "duration": state["duration"],
+            "source": state["source"]
         }), 200
     except Exception as e:
-        print(f"❌ Erreur status irrigation: {e}")
+        logger.error("❌ Erreur status irrigation: %s", e)
         return jsonify({"status": "error", "message": str(e)}), 500
 
 @irrigation_bp.route("/irrigation/reset", methods=["POST"])
 def reset_irrigation_state():
     """Force le reset de l'état de l'irrigation"""
     try:
-        global irrigation_state
-        print("🔄 Reset forcé de l'état irrigation")
+        logger.info("🔄 Reset forcé de l'état irrigation")
         
-        # Arrêter toute irrigation en cours
-        mqtt_service.arreter_arrosage()
+        # Reset complet de l'état et arrêt de toute irrigation en cours
+        stop_irrigation_mqtt()
         
-        # Reset complet de l'état
-        irrigation_state = {
-            "isActive": False,
-            "type": None,
-            "startTime": None,
-            "duration": None,
-            "source": None,
-            "threadId": None
-        }
+        with irrigation_lock:
+            state = dict(irrigation_state)
         
-        print("✅ État irrigation réinitialisé")
+        logger.info("✅ État irrigation réinitialisé")
         return jsonify({
             "success": True,
             "message": "État irrigation réinitialisé",
-            "state": irrigation_state
+            "state": state
         }), 200
         
     except Exception as e:
-        print(f"❌ Erreur reset irrigation: {e}")
+        logger.error("❌ Erreur reset irrigation: %s", e)
         return jsonify({"success": False, "message": str(e)}), 500
 
 @irrigation_bp.route("/irrigation/manual", methods=["POST"])
 def start_manual_irrigation():
     """Démarre une irrigation manuelle avec nettoyage automatique"""
+    data = request.get_json()
+    
+    if not data:
+        return jsonify({"success": False, "message": "Données JSON requises"}), 400
+        
+    duration_hours = int(data.get("durationHours", 0))
+    duration_minutes = int(data.get("durationMinutes", 0))
+    
+    total_minutes = (duration_hours * 60) + duration_minutes
+    if total_minutes <= 0:
+        return jsonify({"success": False, "message": "Durée invalide"}), 400
+    
+    # Vérifier si une irrigation est déjà active (avec nettoyage automatique)
+    if not reserve_irrigation("manual"):
+        return jsonify({
+            "success": False, 
+            "message": "Arrosage en cours. Utilisez /irrigation/reset pour forcer l'arrêt."
+        }), 400
+    
     try:
-        data = request.get_json()
-        
-        if not data:
-            return jsonify({"success": False, "message": "Données JSON requises"}), 400
-            
-        duration_hours = int(data.get("durationHours", 0))
-        duration_minutes = int(data.get("durationMinutes", 0))
-        
-        total_minutes = (duration_hours * 60) + duration_minutes
-        if total_minutes <= 0:
-            return jsonify({"success": False, "message": "Durée invalide"}), 400
-        
-        # Nettoyage automatique avant de vérifier l'état
-        cleanup_stale_irrigation()
-        
-        # Vérifier si une irrigation est déjà active
-        if irrigation_state["isActive"]:
-            print(f"⚠️ Tentative démarrage irrigation mais irrigation active: {irrigation_state}")
-            return jsonify({
-                "success": False, 
-                "message": "Arrosage en cours. Utilisez /irrigation/reset pour forcer l'arrêt."
-            }), 400
-        
-        print(f"🚿 Démarrage irrigation manuelle: {total_minutes} minutes")
+        logger.debug("🚿 Démarrage irrigation manuelle: %s minutes", total_minutes)
         
         # Démarrer l'irrigation via MQTT
-        success, message = mqtt_service.demarrer_arrosage_async(
-            total_minutes * 60,  # Convertir en secondes
-            volume_m3=(total_minutes * 20) / 1000,  # Estimation 20L/min
-            source="manual"
+        success, message = commit_irrigation(
+            "manual",
+            total_minutes,
+            volume_m3=(total_minutes * 20) / 1000  # Estimation 20L/min
         )
-        
-        if success:
-            irrigation_state.update({
-                "isActive": True,
-                "type": "manual",
-                "startTime": time.time(),
-                "duration": total_minutes,
-                "source": "manual",
-                "threadId": threading.current_thread().ident
-            })
-            
-            print(f"✅ Irrigation manuelle démarrée: {total_minutes} min")
-            return jsonify({
-                "success": True,
-                "message": f"Irrigation manuelle démarrée pour {total_minutes} minutes",
-                "mqtt_started": True,
-                "duration_minutes": total_minutes
-            }), 200
-        else:
-            print(f"❌ Échec démarrage irrigation: {message}")
-            return jsonify({"success": False, "message": message}), 500
-            
-    except Exception as e:
-        print(f"❌ Erreur irrigation manuelle: {e}")
-        return jsonify({"success": False, "message": f"Erreur serveur: {str(e)}"}), 500
+    except Exception:
+        # Ne jamais laisser une réservation bloquer les démarrages suivants
+        _release_irrigation_state()
+        raise
+    
+    if success:
+        logger.info("✅ Irrigation manuelle démarrée: %s min", total_minutes)
+        return jsonify({
+            "success": True,
+            "message": f"Irrigation manuelle démarrée pour {total_minutes} minutes",
+            "mqtt_started": True,
+            "duration_minutes": total_minutes
+        }), 200
+    else:
+        logger.error("❌ Échec démarrage irrigation: %s", message)
+        return jsonify({"success": False, "message": message}), 500
 
 @irrigation_bp.route("/irrigation/stop", methods=["POST"])
 def stop_irrigation():
     """Arrête l'irrigation en cours"""
-    try:
-        print("⏹️ Arrêt irrigation demandé")
-        status, response = mqtt_service.arreter_arrosage()
-        
-        irrigation_state.update({
-            "isActive": False,
-            "type": None,
-            "startTime": None,
-            "duration": None,
-            "source": None,
-            "threadId": None
-        })
-        
-        print("✅ Irrigation arrêtée")
-        return jsonify({
-            "success": True,
-            "message": "Irrigation arrêtée",
-            "mqtt_stopped": True
-        }), 200
-        
-    except Exception as e:
-        print(f"❌ Erreur arrêt irrigation: {e}")
-        return jsonify({"success": False, "message": f"Erreur arrêt: {str(e)}"}), 500
+    logger.debug("⏹️ Arrêt irrigation demandé")
+    status, response = stop_irrigation_mqtt()
+    
+    logger.info("✅ Irrigation arrêtée")
+    return Response(STOP_BODY, status=200, mimetype="application/json")
 
 @irrigation_bp.route("/arroser", methods=["POST"])
 def arroser_ml():
@@ -195,57 +273,48 @@ def arroser_ml():
                 "message": "15 features requises pour le modèle ML"
             }), 400
         
-        # Nettoyage automatique avant de vérifier l'état
-        cleanup_stale_irrigation()
-        
-        # Vérifier si une irrigation est déjà active
-        if irrigation_state["isActive"]:
-            print(f"⚠️ Tentative démarrage ML mais irrigation active: {irrigation_state}")
+        # Vérifier si une irrigation est déjà active (avec nettoyage automatique)
+        if not reserve_irrigation("ml"):
             return jsonify({
                 "status": "error",
                 "message": "Arrosage en cours. Utilisez /irrigation/reset pour forcer l'arrêt."
             }), 400
         
-        print("🤖 Début prédiction ML...")
-        
-        # Prédiction ML
         try:
-            prediction = ml_service.predict_irrigation(features)
-        except Exception as ml_error:
-            print(f"❌ Erreur ML: {ml_error}")
-            return jsonify({
-                "status": "error",
-                "message": f"Erreur modèle ML: {str(ml_error)}"
-            }), 500
-        
-        if not prediction:
-            return jsonify({
-                "status": "error",
-                "message": "Erreur lors de la prédiction ML"
-            }), 500
-        
-        # Démarrer l'irrigation automatiquement
-        duration_minutes = prediction["duree_minutes"]
-        print(f"🚿 Démarrage irrigation ML: {duration_minutes} minutes")
-        
-        success, message = mqtt_service.demarrer_arrosage_async(
-            duration_minutes * 60,  # Convertir en secondes
-            volume_m3=prediction["volume_m3"],
-            source="ml"
-        )
+            logger.debug("🤖 Début prédiction ML...")
+        
+            # Prédiction ML (hors verrou: l'état réservé bloque les autres démarrages)
+            try:
+                prediction = ml_service.predict_irrigation(features)
+            except Exception as ml_error:
+                _release_irrigation_state()
+                logger.error("❌ Erreur ML: %s", ml_error)
+                return jsonify({
+                    "status": "error",
+                    "message": f"Erreur modèle ML: {str(ml_error)}"
+                }), 500
+        
+            if not prediction:
+                _release_irrigation_state()
+                return jsonify({
+                    "status": "error",
+                    "message": "Erreur lors de la prédiction ML"
+                }), 500
+        
+            # Démarrer l'irrigation automatiquement
+            duration_minutes = prediction["duree_minutes"]
+            logger.debug("🚿 Démarrage irrigation ML: %s minutes", duration_minutes)
+        
+            success, message = commit_irrigation("ml", duration_minutes, volume_m3=prediction["volume_m3"])
+        except Exception:
+            # Ne jamais laisser une réservation bloquer les démarrages suivants
+            _release_irrigation_state()
+            raise
         
         if success:
-            irrigation_state.update({
-                "isActive": True,
-                "type": "ml",
-                "startTime": time.time(),
-                "duration": duration_minutes,
-                "source": "ml",
-                "threadId": threading.current_thread().ident
-            })
-            print(f"✅ Irrigation ML démarrée: {duration_minutes} min")
+            logger.info("✅ Irrigation ML démarrée: %s min", duration_minutes)
         else:
-            print(f"❌ Échec irrigation ML: {message}")
+            logger.error("❌ Échec irrigation ML: %s", message)
         
         return jsonify({
             "status": "ok",
@@ -258,7 +327,7 @@ def arroser_ml():
         }), 200
         
     except Exception as e:
-        print(f"❌ Erreur ML arrosage: {e}")
+        logger.error("❌ Erreur ML arrosage: %s", e)
         return jsonify({
             "status": "error",
             "message": f"Erreur serveur ML: {str(e)}"
@@ -318,7 +387,7 @@ def get_irrigation_analysis():
         }), 200
         
     except Exception as e:
-        print(f"❌ Erreur analyse irrigation: {e}")
+        logger.error("❌ Erreur analyse irrigation: %s", e)
         # Retourner des données par défaut en cas d'erreur
         return jsonify({
             "status": "ok",
@@ -340,27 +409,9 @@ def get_irrigation_analysis():
 @irrigation_bp.route("/analytics/trends", methods=["GET"])
 def get_trends():
     """Retourne l'analyse des tendances"""
-    try:
-        return jsonify({
-            "waterConsumption": 0.85,
-            "soilMoisture": 42,
-            "efficiency": 88,
-            "trend": "stable"
-        }), 200
-    except Exception as e:
-        print(f"❌ Erreur trends: {e}")
-        return jsonify({"error": str(e)}), 500
+    return Response(TRENDS_BODY, status=200, mimetype="application/json")
 
 @irrigation_bp.route("/analytics/ml-predictions", methods=["GET"])
 def get_ml_predictions():
     """Retourne les prédictions ML"""
-    try:
-        return jsonify({
-            "nextIrrigationHours": 6,
-            "recommendedDuration": 30,
-            "soilCondition": "Optimal",
-            "weatherImpact": "Favorable"
-        }), 200
-    except Exception as e:
-        print(f"❌ Erreur ML predictions: {e}")
-        return jsonify({"error": str(e)}), 500
+    return Response(ML_PREDICTIONS_BODY, status=200, mimetype="application/json")
@@ -3,16 +3,34 @@ import joblib
 import pandas as pd
 import numpy as np
 import os
+import logging
+from functools import lru_cache
 from config.mqtt_config import MODEL_PATH, DEBIT_LITRES_PAR_MIN
 
+logger = logging.getLogger(__name__)
+
+# Colonnes attendues par le modèle (ordre des 15 features)
+FEATURE_COLUMNS = (
+    "Température_air_(°C)", "Précipitation_(mm)", "Humidité_air_(%)", "Vent_moyen_(km/h)",
+    "Type_culture", "Périmètre_agricole_(m2)", "Température_sol_(°C)", "Humidité_sol_(%)",
+    "EC_(dS/m)", "pH_sol", "Azote_(mg/kg)", "Phosphore_(mg/kg)", "Potassium_(mg/kg)",
+    "Fertilité_(score)", "Type_sol"
+)
+
+# Précision (décimales) des features pour le cache des prédictions
+FEATURE_CACHE_DECIMALS = 1
+
 class MLService:
     def __init__(self):
         self.model = None
         self.model_path = os.path.join("models", "xgboost_arrosage_litres.pkl")
+        # Cache des prédictions par tuple de features (vidé à chaque chargement du modèle)
+        self._predict_cached = lru_cache(maxsize=256)(self._predict_from_features)
         self.load_model()
 
     def load_model(self):
         """Charge le modèle XGBoost pré-entraîné"""
+        self._predict_cached.cache_clear()
         if not os.path.exists(self.model_path):
             print(f"⚠️ Modèle non trouvé à l'emplacement : {self.model_path}")
             print("🔄 Utilisation du mode fallback avec calculs par défaut")
@@ -30,73 +48,76 @@ class MLService:
     def predict_irrigation(self, features_data):
         """Prédit la quantité d'eau nécessaire basée sur les features agro-climatiques"""
         try:
-            # Vérifier le format des données d'entrée
-            if not isinstance(features_data, list) or len(features_data) != 15:
-                raise ValueError(f"Exactement 15 features requises, reçu: {len(features_data) if isinstance(features_data, list) else 'non-liste'}")
+            # Vérifier le format des données d'entrée (liste, tuple ou ndarray)
+            if isinstance(features_data, (str, bytes, dict)) or len(features_data) != 15:
+                raise ValueError(f"Exactement 15 features requises, reçu: {len(features_data)}")
             
-            # ✅ CORRECTION FINALE: Conversion directe sans validation isnan problématique
+            # Conversion en un seul passage NumPy (str/int/float acceptés)
             try:
-                features_array = np.array([float(f) for f in features_data], dtype=np.float64)
-                print(f"🔧 Features converties en float64: {features_array}")
+                features_array = np.asarray(features_data, dtype=np.float64)
+                logger.debug("🔧 Features converties en float64: %s", features_array)
                 
-                # Validation manuelle simple sans NumPy isnan
-                for i, val in enumerate(features_array):
-                    if val != val:  # Test NaN simple (NaN != NaN)
-                        raise ValueError(f"Feature {i} est NaN")
+                # Test NaN simple (NaN != NaN), None est converti en NaN par NumPy
+                nan_indices = np.flatnonzero(features_array != features_array)
+                if nan_indices.size:
+                    raise ValueError(f"Feature {nan_indices[0]} est NaN")
                         
             except (ValueError, TypeError) as e:
                 raise ValueError(f"Toutes les features doivent être numériques: {e}")
             
-            # Si le modèle est disponible, l'utiliser
-            if self.model:
-                try:
-                    # Colonnes attendues par le modèle
-                    columns = [
-                        "Température_air_(°C)", "Précipitation_(mm)", "Humidité_air_(%)", "Vent_moyen_(km/h)",
-                        "Type_culture", "Périmètre_agricole_(m2)", "Température_sol_(°C)", "Humidité_sol_(%)",
-                        "EC_(dS/m)", "pH_sol", "Azote_(mg/kg)", "Phosphore_(mg/kg)", "Potassium_(mg/kg)",
-                        "Fertilité_(score)", "Type_sol"
-                    ]
-                    
-                    # Créer DataFrame avec conversion sûre
-                    features_df = pd.DataFrame([features_array], columns=columns)
-                    
-                    # Prédiction avec gestion d'erreur
-                    try:
-                        volume_m3_raw = self.model.predict(features_df)[0]
-                        volume_m3 = max(0.001, float(volume_m3_raw))  # Minimum 1L
-                        print(f"✅ Prédiction ML avec modèle: {volume_m3:.3f} m³")
-                    except Exception as numpy_error:
-                        print(f"⚠️ Erreur modèle, utilisation du fallback: {numpy_error}")
-                        volume_m3 = self._calculate_fallback_volume(features_array)
-                    
-                except Exception as model_error:
-                    print(f"⚠️ Erreur avec le modèle, utilisation du fallback: {model_error}")
-                    volume_m3 = self._calculate_fallback_volume(features_array)
-            else:
-                # Calcul par défaut si pas de modèle
-                volume_m3 = self._calculate_fallback_volume(features_array)
-                print(f"✅ Prédiction fallback: {volume_m3:.3f} m³")
+            if features_array.shape != (15,):
+                raise ValueError(f"Exactement 15 features requises, reçu: {features_array.shape}")
             
-            # Calculs dérivés
-            volume_litres = volume_m3 * 1000
-            duree_minutes = volume_litres / DEBIT_LITRES_PAR_MIN
-            duree_sec = max(30, int(duree_minutes * 60))  # Minimum 30 secondes
-            
-            result = {
-                "volume_m3": float(round(volume_m3, 3)),
-                "volume_litres": float(round(volume_litres, 2)),
-                "duree_minutes": float(round(duree_minutes, 2)),
-                "duree_sec": duree_sec
-            }
+            # Mémoïsation: les capteurs renvoient des mesures quasi identiques d'une
+            # minute à l'autre, on arrondit donc les features avant de les utiliser
+            # comme clé (et comme entrée du modèle, pour un résultat déterministe)
+            features_key = tuple(np.round(features_array, FEATURE_CACHE_DECIMALS).tolist())
+            try:
+                result = self._predict_cached(features_key)
+            except Exception as model_error:
+                # Erreur ponctuelle du modèle: fallback pour cette requête seulement (non mis en cache)
+                logger.warning("⚠️ Erreur avec le modèle, utilisation du fallback: %s", model_error)
+                result = self._build_result(self._calculate_fallback_volume(features_key))
             
-            print(f"📊 Résultat ML final: {result}")
-            return result
+            logger.debug("📊 Résultat ML final: %s", result)
+            return dict(result)
             
         except Exception as e:
-            print(f"❌ Erreur prédiction ML: {str(e)}")
+            logger.error("❌ Erreur prédiction ML: %s", e)
             raise Exception(f"Erreur prédiction ML: {str(e)}")
 
+    def _predict_from_features(self, features):
+        """Calcule la prédiction pour un tuple de 15 features déjà validées.
+        Lève une exception si le modèle échoue, pour que le fallback ne soit pas mis en cache"""
+        features_array = np.array(features, dtype=np.float64)
+        
+        # Si le modèle est disponible, l'utiliser
+        if self.model:
+            # Créer DataFrame avec conversion sûre
+            features_df = pd.DataFrame([features_array], columns=FEATURE_COLUMNS)
+            volume_m3_raw = self.model.predict(features_df)[0]
+            volume_m3 = max(0.001, float(volume_m3_raw))  # Minimum 1L
+            logger.debug("✅ Prédiction ML avec modèle: %.3f m³", volume_m3)
+        else:
+            # Calcul par défaut si pas de modèle
+            volume_m3 = self._calculate_fallback_volume(features_array)
+            logger.debug("✅ Prédiction fallback: %.3f m³", volume_m3)
+        
+        return self._build_result(volume_m3)
+
+    def _build_result(self, volume_m3):
+        """Calculs dérivés (litres, durée) à partir du volume prédit"""
+        volume_litres = volume_m3 * 1000
+        duree_minutes = volume_litres / DEBIT_LITRES_PAR_MIN
+        duree_sec = max(30, int(duree_minutes * 60))  # Minimum 30 secondes
+        
+        return {
+            "volume_m3": float(round(volume_m3, 3)),
+            "volume_litres": float(round(volume_litres, 2)),
+            "duree_minutes": float(round(duree_minutes, 2)),
+            "duree_sec": duree_sec
+        }
+
     def _calculate_fallback_volume(self, features):
         """Calcul par défaut basé sur les paramètres agro-climatiques"""
         try:
@@ -121,7 +142,7 @@ class MLService:
             return max(0.3, min(2.0, base_volume))  # Entre 300L et 2000L
             
         except Exception as e:
-            print(f"⚠️ Erreur calcul fallback: {e}")
+            logger.warning("⚠️ Erreur calcul fallback: %s", e)
             return 0.4  # Valeur par défaut: 400L
 
 # Instance globale
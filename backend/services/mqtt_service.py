@@ -4,6 +4,7 @@ import paho.mqtt.client as mqtt
 import json
 import time
 import threading
+import logging
 from config.mqtt_config import (
     MQTT_BROKER_HOST,
     MQTT_BROKER_PORT,
@@ -13,6 +14,8 @@ from config.mqtt_config import (
 )
 from config.database import log_mqtt, log_irrigation
 
+logger = logging.getLogger(__name__)
+
 class MQTTService:
     def __init__(self):
         self.current_irrigation_thread = None
@@ -28,10 +31,13 @@ class MQTTService:
             print(f"❌ Erreur de connexion MQTT : {e}")
 
     def on_connect(self, client, userdata, flags, rc):
-        print("✅ Connecté au broker MQTT" if rc == 0 else f"❌ Connexion échouée avec code {rc}")
+        if rc == 0:
+            logger.info("✅ Connecté au broker MQTT")
+        else:
+            logger.error("❌ Connexion échouée avec code %s", rc)
 
     def on_publish(self, client, userdata, mid):
-        print("📤 Message MQTT publié")
+        logger.debug("📤 Message MQTT publié")
 
     def envoyer_commande_mqtt(self, device_state: int):
         timestamp = str(int(time.time() * 1000))
@@ -55,7 +61,7 @@ class MQTTService:
         }
 
         try:
-            print(f"📤 Publication MQTT: {payload} → {MQTT_TOPIC_DATA}")
+            logger.debug("📤 Publication MQTT: %s → %s", payload, MQTT_TOPIC_DATA)
             result = self.client.publish(
                 MQTT_TOPIC_DATA,
                 json.dumps(payload),
@@ -65,7 +71,7 @@ class MQTTService:
             log_mqtt(MQTT_TOPIC_DATA, json.dumps(payload), result.rc)
             return result.rc, "OK" if result.rc == mqtt.MQTT_ERR_SUCCESS else "Erreur"
         except Exception as e:
-            print(f"❌ Erreur de publication MQTT : {e}")
+            logger.error("❌ Erreur de publication MQTT : %s", e)
             log_mqtt(MQTT_TOPIC_DATA, json.dumps(payload), 500)
             return 500, str(e)
 
@@ -77,21 +83,21 @@ class MQTTService:
             # Démarrer l'irrigation
             status_start, _ = self.envoyer_commande_mqtt(1)
             log_irrigation("START", duree_sec / 60, volume_m3, f"MQTT_START_{status_start}", source)
-            print(f"🚿 Arrosage lancé pour {duree_sec} secondes")
+            logger.info("🚿 Arrosage lancé pour %s secondes", duree_sec)
             
             # Attente avec possibilité d'interruption
             if self.stop_irrigation_event.wait(timeout=duree_sec):
-                print("⏹️ Arrosage interrompu par signal d'arrêt")
+                logger.info("⏹️ Arrosage interrompu par signal d'arrêt")
             else:
-                print("⏰ Durée d'arrosage écoulée")
+                logger.info("⏰ Durée d'arrosage écoulée")
             
             # Arrêter l'irrigation
             status_stop, _ = self.envoyer_commande_mqtt(0)
             log_irrigation("STOP", duree_sec / 60, volume_m3, f"MQTT_STOP_{status_stop}", source)
-            print("⏹️ Arrosage terminé")
+            logger.info("⏹️ Arrosage terminé")
             
         except Exception as e:
-            print(f"❌ Erreur séquence arrosage: {e}")
+            logger.error("❌ Erreur séquence arrosage: %s", e)
             self.envoyer_commande_mqtt(0)
             log_irrigation("ERROR", None, None, f"ERROR_{str(e)}", source)
         finally:
@@ -101,7 +107,7 @@ class MQTTService:
     def demarrer_arrosage_async(self, duree_sec: int, volume_m3: float = None, source: str = "manual"):
         # Vérifier si un thread d'irrigation est déjà actif
         if self.current_irrigation_thread and self.current_irrigation_thread.is_alive():
-            print("⚠️ Thread d'irrigation déjà actif")
+            logger.warning("⚠️ Thread d'irrigation déjà actif")
             return False, "Arrosage déjà en cours"
         
         # Créer et démarrer le nouveau thread
@@ -126,14 +132,14 @@ class MQTTService:
             if self.current_irrigation_thread and self.current_irrigation_thread.is_alive():
                 self.current_irrigation_thread.join(timeout=5)
                 if self.current_irrigation_thread.is_alive():
-                    print("⚠️ Thread d'irrigation ne s'arrête pas, forcé à None")
+                    logger.warning("⚠️ Thread d'irrigation ne s'arrête pas, forcé à None")
                     self.current_irrigation_thread = None
             
-            print("✅ Arrosage arrêté avec succès")
+            logger.info("✅ Arrosage arrêté avec succès")
             return status, response
             
         except Exception as e:
-            print(f"❌ Erreur arrêt arrosage: {e}")
+            logger.error("❌ Erreur arrêt arrosage: %s", e)
             return 500, str(e)
 
 # Instance globale
@@ -1,9 +1,12 @@
 
 import requests
 import os
+import logging
 from datetime import datetime
 from config.database import log_weather
 
+logger = logging.getLogger(__name__)
+
 class WeatherService:
     def __init__(self):
         self.api_key = os.getenv("OPENWEATHER_API_KEY")
@@ -13,7 +16,7 @@ class WeatherService:
     def get_weather_data(self, location):
         """Récupère les données météo pour une ville donnée"""
         if not self.api_key:
-            print("⚠️ Pas de clé API OpenWeather, utilisation données de secours")
+            logger.debug("⚠️ Pas de clé API OpenWeather, utilisation données de secours")
             return self._get_fallback_data(location)
         
         # Mapping des villes pour le Sénégal
@@ -26,7 +29,7 @@ class WeatherService:
         
         try:
             url = f"{self.base_url}?q={city}&appid={self.api_key}&units=metric&lang=fr"
-            print(f"🌍 Appel API météo: {url}")
+            logger.debug("🌍 Appel API météo: %s", url)
             response = requests.get(url, timeout=10)
             
             if response.status_code == 200:
@@ -43,14 +46,14 @@ class WeatherService:
                     precipitation=float(weather_data['precipitation'].replace(' mm', ''))
                 )
                 
-                print(f"✅ Données météo API récupérées pour {city}")
+                logger.debug("✅ Données météo API récupérées pour %s", city)
                 return weather_data
             else:
-                print(f"⚠️ API Météo error {response.status_code}: {response.text}")
+                logger.warning("⚠️ API Météo error %s: %s", response.status_code, response.text)
                 return self._get_fallback_data(location)
                 
         except Exception as e:
-            print(f"❌ Erreur météo API: {e}")
+            logger.error("❌ Erreur météo API: %s", e)
             return self._get_fallback_data(location)
     
     def get_last_update_time(self):